@@ -27,7 +27,8 @@ def apply_pdf_watermark(pdf_path, watermark):
     ret_dict = pdf_obj.modify_file(
         features=new_fd,
         dir=constants.TEMP_DIR,
-        verbose=False
+        verbose=False,
+        extract_feats=False
     )
 
     finalfd = featureedit_p3.FeatureEdit(ret_dict['path']).retrieve_feature_dictionary()
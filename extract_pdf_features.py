@@ -14,32 +14,58 @@ from mimicus import featureedit_p3
 
 
 def extract_feature_worker(data_in):
-    """ Worker thread that extracts the PDFRate features from each fle.
+    """ Worker process that extracts the PDFRate features from one file.
 
-    :param data_in: (tuple) incoming data for the worker
-    :return: (dict) extracted features per file
+    Files are handed out in small batches of four, rather than as one fixed
+    share per worker, so that a few large PDFs do not keep a single worker
+    busy while the others sit idle.
+
+    :param data_in: (tuple) directory and name of the file
+    :return: (tuple) file name and its extracted features, None on error
     """
 
     pdf_dir = data_in[0]
-    pdf_list = data_in[1]
-    fd_dict = {}
+    f = data_in[1]
+    pth = os.path.join(pdf_dir, f)
+
+    # noinspection PyBroadException
+    try:
+        pdf_obj = featureedit_p3.FeatureEdit(pth)
+        fd = pdf_obj.retrieve_feature_dictionary()
+        pdf_obj.close()
+
+    except:
+        print('Error while extracting features for file: {}'.format(pth))
+        return f, None
 
-    for f in pdf_list:
-        pth = os.path.join(pdf_dir, f)
+    return f, fd
 
-        # noinspection PyBroadException
-        try:
-            pdf_obj = featureedit_p3.FeatureEdit(pth)
-            fd = pdf_obj.retrieve_feature_dictionary()
 
-            fd_dict[f] = fd
+def extract_dir_features(pdf_dir, processes):
+    """ Extracts the PDFRate features from all the files in a directory.
 
-        except:
-            print('Error while extracting features for file: {}'.format(pth))
+    :param pdf_dir: (str) directory containing the PDF files
+    :param processes: (int) number of worker processes
+    :return: (dict) file name to feature dictionary, for every file whose
+        features could be extracted, in the same order on every run as the
+        train/test split of the dataset depends on it
+    """
+
+    # Enumerate the files and create data for workers, in the order of the
+    # former per-process sub-lists so that the dataset keeps its row order
+    pdf_files = os.listdir(pdf_dir)
+    data_ins = [(pdf_dir, f) for i in range(processes) for f in pdf_files[i::processes]]
 
-        del pdf_obj
+    # Spawn workers and collect feature dictionaries in input order
+    features = {}
+    p = Pool(processes=processes)
+    for f, fd in p.imap(extract_feature_worker, data_ins, chunksize=4):
+        if fd is not None:
+            features[f] = fd
+    p.close()
+    p.join()
 
-    return fd_dict
+    return features
 
 
 def extract_features(args):
@@ -67,23 +93,9 @@ def extract_features(args):
     # If needed extract the features from benign PDF files
     if not check_gw:
         print('Benign dataset file NOT found, creating: {}'.format(gw_path))
-        gw_dict = {}
-
-        # Enumerate the files and create per-process sub-lists
-        pdf_files = os.listdir(gw_pdf_dir)
-        pdf_sublists = [pdf_files[i::processes] for i in range(processes)]
+        gw_dict = extract_dir_features(gw_pdf_dir, processes)
 
-        # Create data for workers
-        data_ins = [(gw_pdf_dir, sub_list) for sub_list in pdf_sublists]
-
-        # Spawn workers and await completion
-        p = Pool(processes=processes)
-        data_dictionaries = p.map(extract_feature_worker, data_ins)
-        p.close()
-
-        # Collect feature dictionaries and save resulting file
-        for dd in data_dictionaries:
-            gw_dict.update(dd)
+        # Save resulting file
         np.save(gw_path, gw_dict)
 
     else:
@@ -92,23 +104,9 @@ def extract_features(args):
     # If needed extract the features from malicious PDF files
     if not check_mw:
         print('Malicious dataset file NOT found, creating: {}'.format(mw_path))
-        mw_dict = {}
-
-        # Enumerate the files and create per-process sub-lists
-        pdf_files = os.listdir(mw_pdf_dir)
-        pdf_sublists = [pdf_files[i::processes] for i in range(processes)]
-
-        # Create data for workers
-        data_ins = [(mw_pdf_dir, sub_list) for sub_list in pdf_sublists]
-
-        # Spawn workers and await completion
-        p = Pool(processes=processes)
-        data_dictionaries = p.map(extract_feature_worker, data_ins)
-        p.close()
+        mw_dict = extract_dir_features(mw_pdf_dir, processes)
 
-        # Collect feature dictionaries and save resulting file
-        for dd in data_dictionaries:
-            mw_dict.update(dd)
+        # Save resulting file
         np.save(mw_path, mw_dict)
 
     else:
@@ -26,27 +26,29 @@ Created on October 22, 2012.
 """
 This is a python3 porting of the original featureedit.py code.
 With the intention of keeping the results as identical as possible
-to the original, no speed or stylistic modification has been
-added, and only the bare minimum changes necessary to make it
-work have been performed.
+to the original, no stylistic modification has been added, and
+only the bare minimum changes necessary to make it work have been
+performed.
+
+The only departure from this rule concerns speed: the Perl
+one-liners used to scan the PDF file have been replaced by
+equivalent in-process regular expressions over the file content,
+mapped once per FeatureEdit object.
 """
 
 import calendar
-import copy
-import dateutil.parser
+import datetime
 import mmap
 import numpy
-import operator
-import os
 import re
-import subprocess
 import sys
-import tempfile
 import time
 import traceback
+import types
 
-# New
-import hashlib
+# dateutil.parser, secrets and tempfile are imported where needed, as 
+# only dates the built-in parsing does not cover and file modification 
+# use them
 
 
 class CachedMethod(object):
@@ -54,17 +56,26 @@ class CachedMethod(object):
     Used as a custom class method decorator to calculate the return 
     value of a function once and than cache it for subsequent 
     retrieval. 
+    
+    The cached value is stored in the instance dictionary under the 
+    name of the method, shadowing this descriptor, so that subsequent 
+    calls are plain attribute lookups. 
     '''
     def __init__(self, calculate_function):
         self._calculate = calculate_function
+        self._name = calculate_function.__name__
+
+    def __set_name__(self, owner, name):
+        # Private methods are looked up by their mangled name
+        self._name = name
 
     def __get__(self, obj, _=None):
-        attr_name = '_{}_attr'.format(self._calculate.__name__)
-        if hasattr(obj, attr_name):
-            return getattr(obj, attr_name)
+        if obj is None:
+            return self
         value = self._calculate(obj)
-        setattr(obj, attr_name, lambda: value)
-        return lambda: value
+        cached = lambda: value
+        obj.__dict__[self._name] = cached
+        return cached
 
 class FeatureEditError(Exception):
     '''
@@ -115,29 +126,122 @@ class MaximumExceededError(FeatureEditError):
     def __str__(self):
         return self.message
 
-def _perl_regex(regex, infile):
+# The regular expressions of the Perl one-liners formerly run by 
+# perl -ln0777e over the PDF file (quoted in the comments).
+# print $1 while /\/ModDate\((.*?)\)/g
+_regex_pdf_moddate = re.compile(rb'/ModDate\((.*?)\)')
+# print $1 while /<x[am]p:CreateDate>(.*?)<\/x[am]p:CreateDate>/g
+_regex_pdf_createdate = re.compile(rb'<x[am]p:CreateDate>(.*?)</x[am]p:CreateDate>')
+# print $1 while /\/ID\[[^\d|A-F|a-f]*([\d|A-F|a-f]*)/g
+_regex_pdf_id0 = re.compile(rb'/ID\[[^\d|A-F|a-f]*([\d|A-F|a-f]*)')
+# print $1 while /\/ID\[[^\d|A-F|a-f]*[\d|A-F|a-f]*[^\d|A-F|a-f]*([\d|A-F|a-f]*)/g
+_regex_pdf_id1 = re.compile(rb'/ID\[[^\d|A-F|a-f]*[\d|A-F|a-f]*[^\d|A-F|a-f]*([\d|A-F|a-f]*)')
+# print $1 while /\/Title[^\w\d]*\((.*?[^\\]?)\)/g
+_regex_pdf_title = re.compile(rb'/Title[^\w\d]*\((.*?[^\\]?)\)')
+# print $1 while /\/Author[^\w\d]*\((.*?[^\\]?)\)/g
+_regex_pdf_author = re.compile(rb'/Author[^\w\d]*\((.*?[^\\]?)\)')
+# print $1 while /\/Producer[^\w\d]*\((.*?[^\\]?)\)/g
+_regex_pdf_producer = re.compile(rb'/Producer[^\w\d]*\((.*?[^\\]?)\)')
+# print $1 while /Producer>(.*?)<\//g
+_regex_pdf_producer_xmp = re.compile(rb'Producer>(.*?)</')
+# print $1 while /\/Creator[^\w\d]*\((.*?[^\\]?)\)/g
+_regex_pdf_creator = re.compile(rb'/Creator[^\w\d]*\((.*?[^\\]?)\)')
+# print $1 while /CreatorTool>(.*?)<\//g
+_regex_pdf_creator_tool = re.compile(rb'CreatorTool>(.*?)</')
+# print $1 while /\/Subject[^\w\d]*\((.*?[^\\]?)\)/g
+_regex_pdf_subject = re.compile(rb'/Subject[^\w\d]*\((.*?[^\\]?)\)')
+# print $1 while /\/Keywords[^\w\d]*\((.*?[^\\]?)\)/g
+_regex_pdf_keywords = re.compile(rb'/Keywords[^\w\d]*\((.*?[^\\]?)\)')
+# print $1 while /\<pdf:Keywords>(.*?)<\/pdf:Keywords>/g
+_regex_pdf_keywords_xmp = re.compile(rb'<pdf:Keywords>(.*?)</pdf:Keywords>')
+# print $1 while /\/Company[^\w\d]*\((.*?[^\\]?)\)/g
+_regex_pdf_company = re.compile(rb'/Company[^\w\d]*\((.*?[^\\]?)\)')
+
+def _group_lines(pattern, data):
     '''
-    Runs a child perl process on a given file evaluating the given regex and 
-    returns the standard output as a string.
+    Returns the lines of the first group of every match of the given 
+    pattern in the given data, i.e. what print $1 printed for them, as 
+    bytes. Groups spanning line breaks give several lines, as before.
     '''
-    perl = subprocess.Popen(['perl', '-ln0777e', regex, infile], stdout=subprocess.PIPE)
-    (stdoutdata, stderrdata) = perl.communicate()
-    if stderrdata is not None and len(stderrdata) > 0:
-        sys.stderr.write('Child (perl) error: %s\n' % stderrdata)
-        raise
-    else:
-        return stdoutdata
+    return [line for match in pattern.finditer(data) for line in (match.group(1) + b'\n').splitlines()]
+
+def _last_start_group(pattern, data):
+    '''
+    Returns the offset and the first group of the last match of the given 
+    pattern in the given data, or None if there are no matches, as read 
+    from the last line print @-[1], " ", $1 printed for the matches.
+    '''
+    match = None
+    for match in pattern.finditer(data):
+        pass
+    if match is None:
+        return None
+    group = match.group(1)
+    if b' ' not in group and b'\r' not in group and b'\n' not in group:
+        return (match.start(1), group)
+    # A group with spaces or line breaks split up the printed line
+    fields = (b'%d %s\n' % (match.start(1), group)).splitlines()[-1].split(b' ')
+    return (int(fields[0]), fields[1])
 
 # Regular expressions precompiled for speed
-_regex_pdf_box = re.compile(r'\d\s+([+|-]?(?:\d+\.?\d*|\d*\.?\d+))\s+([+|-]?(?:\d+\.?\d*|\d*\.?\d+))\s+([+|-]?(?:\d+\.?\d*|\d*\.?\d+))\s+([+|-]?(?:\d+\.?\d*|\d*\.?\d+))')
-_regex_pdf_image_height = re.compile(r'.*\/Height(?:\s|\n)+(\d+).*')
-_regex_pdf_image_width = re.compile(r'.*\/Width(?:\s|\n)+(\d+).*')
+_regex_pdf_box = re.compile(rb'\[\s*([+|-]?(?:\d+\.?\d*|\d*\.?\d+))\s+([+|-]?(?:\d+\.?\d*|\d*\.?\d+))\s+([+|-]?(?:\d+\.?\d*|\d*\.?\d+))\s+([+|-]?(?:\d+\.?\d*|\d*\.?\d+))\s*\]')
+_regex_pdf_image = re.compile(rb'<<[^<]*?/Height\s+\d+.*?>>')
+# Formerly the Perl one-liner 
+# print sprintf("%d", @-[1]) while /(<<(?=.*\/Height\s+\d+)(?=.*\/Width\s+\d+)(?:.*?<<.*>>)*.*?>>)/g
+_regex_pdf_image_position = re.compile(rb'(<<(?=.*/Height\s+\d+)(?=.*/Width\s+\d+)(?:.*?<<.*>>)*.*?>>)')
+# The last /Height and /Width of an image dictionary
+_regex_pdf_image_height = re.compile(r'.*\/Height(?:\s|\n)+(\d+).*', re.DOTALL)
+_regex_pdf_image_width = re.compile(r'.*\/Width(?:\s|\n)+(\d+).*', re.DOTALL)
+
+# Upper bounds (inclusive) of the xsmall, small, med and large image sizes 
+# in pixels; larger images are xlarge
+_image_size_thresholds = numpy.array([4096, 64000, 786432, 12582912])
+
+# An XMP date in the common YYYY-MM-DD[THH:mm:SS[.s][Z|+HH:mm|-HH:mm]] form
+_regex_xmp_date = re.compile(rb'(\d{4})-(\d\d)-(\d\d)(?:T(\d\d):(\d\d):(\d\d)(?:\.\d{1,6})?(?:(Z)|([+-])(\d\d):(\d\d))?)?')
 
 # Original
 # _regex_pdf_version = re.compile(r'%PDF-1\.(\d)')
 # New
 _regex_pdf_version = re.compile(b'%PDF-1\.(\d)')
 
+# Keywords counted in a single pass over the file, equivalent to the Perl 
+# expressions while (/<regex>/g) {$c++} print $c
+# Keywords are mapped to their feature and to whether they must be preceded 
+# and/or followed by a delimiter ([^\w\d]). Delimiters are checked on every 
+# occurrence, so that the counts replicate the separate Perl scans, e.g. 
+# /[^\w\d]xref[^\w\d]/g, including the delimiters they consume.
+_keyword_feats = {b'xref' : ('count_xref', True, True), 
+                b'trailer' : ('count_trailer', True, True), 
+                b'startxref' : ('count_startxref', True, True), 
+                b'%EOF' : ('count_eof', False, False)}
+# The names of the same pass, followed by a delimiter, as regexes matching 
+# their hex-escaped (obfuscated) variants too, mapped to the features 
+# counting the plain names, e.g. /\/Page[^\w\d]/g, and all variants
+_name_feats = {'page' : (rb'(?:P|#50)(?:a|#61)(?:g|#67)(?:e|#65)', 'count_page', 'count_page_obs'), 
+                'objstm' : (rb'(?:O|#4[fF])(?:b|#62)(?:j|#6[aA])(?:S|#53)(?:t|#74)(?:m|#6[Dd])', 'count_objstm', 'count_objstm_obs'), 
+                'js' : (rb'(?:J|#4[aA])(?:S|#53)', 'count_js', 'count_js_obs'), 
+                'javascript' : (rb'(?:J|#4[aA])(?:a|#61)(?:v|#76)(?:a|#61)(?:S|#53)(?:c|#63)(?:r|#72)(?:i|#69)(?:p|#70)(?:t|#74)', 'count_javascript', 'count_javascript_obs'), 
+                'action' : (rb'(?:O|#4F)(?:p|#70)(?:e|#65)(?:n|#6[eE])(?:A|#41)(?:c|#63)(?:t|#74)(?:i|#69)(?:o|#6[fF])(?:n|#6[eE])|(?:A|#41)(?:A|#41)', 'count_action', 'count_action_obs'), 
+                'acroform' : (rb'(?:A|#41)(?:c|#63)(?:r|#72)(?:o|#6[fF])(?:F|#46)(?:o|#6[fF])(?:r|#72)(?:m|#6[dD])', 'count_acroform', 'count_acroform_obs'), 
+                'font' : (rb'(?:F|#46)(?:o|#6[fF])(?:n|#6[eE])(?:t|#74)', 'count_font', 'count_font_obs')}
+_regex_keywords = re.compile(rb'xref|trailer|startxref|%EOF|endobj|obj|endstream|stream|/(?:' + 
+                             b'|'.join(b'(?P<%s>%s)' % (name.encode(), regex) for (name, (regex, _, _)) in _name_feats.items()) + rb')')
+# The object and stream keywords of the same pass, whose context is checked 
+# against /\d+\s+\d+\s+obj/, /\s+endobj\s+/, /[^\w]stream\s+/ and 
+# /[^\w]endstream\s+/ respectively
+_structure_feats = {b'obj' : 'count_obj', 
+                b'endobj' : 'count_endobj', 
+                b'stream' : 'count_stream', 
+                b'endstream' : 'count_endstream'}
+# The features of the same pass whose occurrences are also located, by the 
+# offset of the keyword or of the slash of the name
+_offset_feats = ('count_obj', 'count_page', 'count_acroform')
+_word_bytes = frozenset(b'0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZ_abcdefghijklmnopqrstuvwxyz')
+_whitespace_bytes = b' \t\n\r\x0b\x0c'
+_digit_bytes = b'0123456789'
+_regex_whitespace = re.compile(rb'\s*')
+
 # Features which are simple to increment
 _incrementable_feats = {'count_acroform' : '/AcroForm', 
                 'count_acroform_obs' : '/Acro#46orm', 
@@ -181,15 +285,176 @@ _metadata_feats = {'author' : ' /Author({})\n',
                     'producer' : ' /Producer({})\n', 
                     'subject' : ' /Subject({})\n', 
                     'title' : ' /Title({})\n'}
+# The character added to a metadata string per unit of each feature suffix
+_metadata_suffix_chars = {'lc' : 'a', 
+                    'uc' : 'Z', 
+                    'num' : '3', 
+                    'oth' : '-', 
+                    'dot' : '.'}
+
+# Only the replacements of the ported bytes.replace() chain which are not 
+# no-ops, done in a single pass. A carriage return absorbs the escaped 
+# newlines following it, as they were removed before CRLF got collapsed.
+_regex_pdf_literal_escape = re.compile(rb'\\[()]|\\\n|\r(?:\\\n)*\n?')
+_pdf_literal_unescape = {b'\\(' : b'(', b'\\)' : b')', b'\\\n' : b''}
+
+def _find_all(data, literal):
+    '''
+    Yields the offsets of the non-overlapping occurrences of the literal 
+    byte string in data, using its plain substring search.
+    '''
+    i = data.find(literal)
+    while i >= 0:
+        yield i
+        i = data.find(literal, i + len(literal))
+
+def _stream_distances(data):
+    '''
+    Yields the distance between the 'stream' and the 'endstream' keyword of 
+    every non-overlapping match of /[^\w](s)tream\s.*?[^\w](e)ndstream\s/s 
+    in data. Substring search finds the keywords, while the lazy regex 
+    stepped through every byte of the stream contents.
+    '''
+    size = len(data)
+    k = data.find(b'stream', 1)
+    while k >= 0:
+        if data[k - 1] in _word_bytes or k + 6 >= size or data[k + 6] not in _whitespace_bytes:
+            k = data.find(b'stream', k + 1)
+            continue
+        e = data.find(b'endstream', k + 8)
+        while e >= 0 and (data[e - 1] in _word_bytes or e + 9 >= size or data[e + 9] not in _whitespace_bytes):
+            e = data.find(b'endstream', e + 1)
+        if e < 0:
+            # No later 'stream' can be closed either
+            return
+        yield e - k
+        k = data.find(b'stream', e + 11)
+
+def _run_start(data, end, run_bytes):
+    '''
+    Returns the offset at which the run of run_bytes ending just before 
+    offset end in data begins, i.e. end itself if there is no such run.
+    '''
+    while end > 0:
+        start = max(0, end - 64)
+        kept = len(data[start:end].rstrip(run_bytes))
+        if kept > 0:
+            return start + kept
+        end = start
+    return 0
+
+# Tables marking the ASCII characters for which str.islower(), 
+# str.isupper() and str.isdigit() hold, respectively
+_lowercase_table = bytes(1 if chr(i).islower() else 0 for i in range(128)) + bytes(128)
+_uppercase_table = bytes(1 if chr(i).isupper() else 0 for i in range(128)) + bytes(128)
+_digit_table = bytes(1 if chr(i).isdigit() else 0 for i in range(128)) + bytes(128)
+
+def _count_char_classes(b):
+    '''
+    Returns the numbers of lowercase, uppercase, digit and '.' characters 
+    and the total number of characters in the byte string b decoded as 
+    UTF-8, as counted by str.islower(), str.isupper(), str.isdigit(), 
+    str.count('.') and len(). ASCII strings are counted without decoding. 
+    '''
+    if not b.isascii():
+        # Unicode character classes
+        s = b.decode(errors='replace')
+        return (sum(1 for _ in filter(str.islower, s)), 
+                sum(1 for _ in filter(str.isupper, s)), 
+                sum(1 for _ in filter(str.isdigit, s)), 
+                s.count('.'), 
+                len(s))
+    return (b.translate(_lowercase_table).count(1), 
+            b.translate(_uppercase_table).count(1), 
+            b.translate(_digit_table).count(1), 
+            b.count(b'.'), 
+            len(b))
 
 def _sanitize_PDF_literal_string(pdfstr):
     # Orignal
     # pdfstr = pdfstr.replace(r'\n', '\n').replace(r'\r', '\r').replace(r'\t', '\t').replace(r'\b', '\b').replace(r'\f', '\f').replace(r'\(', '(').replace(r'\)', ')').replace(r'\\', '\\')
     # pdfstr = pdfstr.replace('\\\n', '').replace('\r\n', '\n').replace('\r', '\n')
     # New
-    pdfstr = pdfstr.replace(b'\n', b'\n').replace(b'\r', b'\r').replace(b'\t', b'\t').replace(b'\b', b'\b').replace(b'\f', b'\f').replace(b'\(', b'(').replace(b'\)', b')').replace(b'\\', b'\\')
-    pdfstr = pdfstr.replace(b'\\\n', b'').replace(b'\r\n', b'\n').replace(b'\r', b'\n')
-    return pdfstr
+    return _regex_pdf_literal_escape.sub(lambda m: _pdf_literal_unescape.get(m.group(), b'\n'), pdfstr)
+
+def _utc_timestamp(YYYY, MM, DD, HH, mm, SS):
+    '''
+    Returns the POSIX timestamp of the given UTC date and time as 
+    dateutil.parser used to compute it from the YYYYMMDDHHmmSS+0000 string, 
+    or -1 if the date and time are invalid. 
+    '''
+    if min(YYYY, MM, DD, HH, mm, SS) < 0:
+        # The string dateutil saw was no longer digits only, let it decide
+        import dateutil.parser
+        datetime_str = '{Y:0>4}{m:0>2}{d:0>2}{H:0>2}{M:0>2}{S:0>2}\
++0000'.format(Y=YYYY, m=MM, d=DD, H=HH, M=mm, S=SS)
+        try:
+            timestamp = dateutil.parser.parse(datetime_str)
+            return int(calendar.timegm(timestamp.utctimetuple()))
+        except:
+            return -1
+    try:
+        datetime.datetime(YYYY, MM, DD, HH, mm, SS)
+    except ValueError:
+        return -1
+    return calendar.timegm((YYYY, MM, DD, HH, mm, SS))
+
+def _parse_xmp_date(r):
+    '''
+    Returns the POSIX timestamp and the time zone offset in seconds (-1 if 
+    absent) of the XMP date r, the way dateutil.parser reads it, or 
+    (-1, -1) if it cannot be parsed.
+    '''
+    match = _regex_xmp_date.fullmatch(r)
+    if match is None or match.group(9) is not None and (int(match.group(9)) > 23 or int(match.group(10)) > 59):
+        # Anything else is left to the general parser
+        import dateutil.parser
+        try:
+            timestamp = dateutil.parser.parse(r)
+        except:
+            return (-1, -1)
+    else:
+        fields = [int(field) if field is not None else 0 for field in match.group(1, 2, 3, 4, 5, 6)]
+        if match.group(7) is not None:
+            tzinfo = datetime.timezone.utc
+        elif match.group(8) is not None:
+            tz_sec = int(match.group(9)) * 3600 + int(match.group(10)) * 60
+            tzinfo = datetime.timezone(datetime.timedelta(seconds=tz_sec if match.group(8) == b'+' else -tz_sec))
+        else:
+            tzinfo = None
+        try:
+            timestamp = datetime.datetime(*fields, tzinfo=tzinfo)
+        except ValueError:
+            return (-1, -1)
+    try:
+        ts = int(calendar.timegm(timestamp.utctimetuple()))
+    except:
+        ts = -1
+    try:
+        timezone = timestamp.strftime("%z")
+        if not timezone:
+            return (ts, -1)
+        tz_sec = int(timezone[1:3]) * 3600 + int(timezone[3:5]) * 60
+        return (ts, tz_sec if timezone[0] == '+' else -tz_sec)
+    except Exception:
+        return (ts, -1)
+
+def _format_tz_offset(tz, sep):
+    '''
+    Formats the time zone offset tz (in seconds) the way modify_file writes 
+    it into dates, i.e. Z for 0, otherwise the sign, hours, sep and minutes. 
+    '''
+    if tz == 0:
+        return 'Z'
+    return '{sign}{h:0>2}{sep}{m:0>2}'.format(sign = '+' if tz > 0 else '-', h = abs(tz) / 3600, sep = sep, m = (abs(tz) % 3600) / 60)
+
+# The formatted time zone offsets from -12:00 to +14:00 in 15 minute steps, 
+# by (offset, separator)
+_tz_offset_strings = {(tz, sep) : _format_tz_offset(tz, sep) for sep in ("'", ':') for tz in range(-12 * 3600, 14 * 3600 + 1, 900)}
+
+def _tz_offset_string(tz, sep):
+    tz_str = _tz_offset_strings.get((tz, sep))
+    return tz_str if tz_str is not None else _format_tz_offset(tz, sep)
 
 class FileDefined:
     '''
@@ -351,9 +616,41 @@ _pdfrate_feature_descriptions = {
                 'version'                 :{'type':int, 'range':(1, 8), 'edit':'y'}}
 
 '''
-A sorted list of feature names.
+A sorted tuple of feature names.
+'''
+_pdfrate_feature_names = tuple(sorted(_pdfrate_feature_descriptions.keys()))
+
+'''
+Read-only views of the feature descriptions, handed out by the 
+FeatureDescriptor class instead of copies.
+'''
+_pdfrate_feature_descriptions_view = types.MappingProxyType(_pdfrate_feature_descriptions)
+_pdfrate_feature_description_views = {name : types.MappingProxyType(desc) for (name, desc) in _pdfrate_feature_descriptions.items()}
+
+'''
+A read-only numpy array with 1 for every modifiable feature, otherwise 0.
+'''
+_pdfrate_feature_mask = numpy.array([1 if _pdfrate_feature_descriptions[name]['edit'] == 'y' else 0 for name in _pdfrate_feature_names])
+_pdfrate_feature_mask.setflags(write=False)
+
+'''
+A numpy array with the data type code of every feature (0 for int, 1 for 
+float, 2 for bool) and boolean masks selecting the features of each type.
 '''
-_pdfrate_feature_names = sorted(_pdfrate_feature_descriptions.keys())
+_pdfrate_type_codes = {int : 0, float : 1, bool : 2}
+_pdfrate_feature_types = numpy.array([_pdfrate_type_codes[_pdfrate_feature_descriptions[name]['type']] for name in _pdfrate_feature_names], dtype=numpy.int8)
+_pdfrate_feature_types.setflags(write=False)
+_pdfrate_int_mask = _pdfrate_feature_types == _pdfrate_type_codes[int]
+_pdfrate_float_mask = _pdfrate_feature_types == _pdfrate_type_codes[float]
+_pdfrate_bool_mask = _pdfrate_feature_types == _pdfrate_type_codes[bool]
+
+'''
+Lower and upper feature bounds as float arrays, with NaN in place of the 
+FileDefined bounds, and the (feature index, feature name, 0 for the lower 
+or 1 for the upper bound) triples locating the FileDefined ones. 
+'''
+_pdfrate_feature_bounds = tuple(numpy.array([numpy.nan if _pdfrate_feature_descriptions[name]['range'][b] == FileDefined else _pdfrate_feature_descriptions[name]['range'][b] for name in _pdfrate_feature_names], dtype=float) for b in (0, 1))
+_pdfrate_filedefined_bounds = tuple((i, name, b) for (i, name) in enumerate(_pdfrate_feature_names) for b in (0, 1) if _pdfrate_feature_descriptions[name]['range'][b] == FileDefined)
 
 class FeatureDescriptor(object):
     '''
@@ -369,25 +666,26 @@ class FeatureDescriptor(object):
         '''
         Returns the i-th feature name. 
         '''
-        return copy.copy(_pdfrate_feature_names[i])
+        return _pdfrate_feature_names[i]
     
     @staticmethod
     def get_feature_names():
         '''
-        Returns a sorted list of feature names. 
+        Returns a sorted tuple of feature names. 
         '''
-        return copy.copy(_pdfrate_feature_names)
+        return _pdfrate_feature_names
     
     @staticmethod
     def get_feature_description(feat):
         '''
         Returns the description of the given feature as defined by the 
-        FeatureDescriptor.get_feature_descriptions() method. 
+        FeatureDescriptor.get_feature_descriptions() method, as a 
+        read-only mapping. 
         
         feat - name or index of the feature
         '''
-        feat_name = FeatureDescriptor.get_feature_names()[feat] if type(feat) == int else feat
-        return copy.copy(_pdfrate_feature_descriptions[feat_name])
+        feat_name = _pdfrate_feature_names[feat] if type(feat) == int else feat
+        return _pdfrate_feature_description_views[feat_name]
     
     @staticmethod
     def get_feature_descriptions():
@@ -402,16 +700,19 @@ class FeatureDescriptor(object):
         bound cannot be modified further than what is currently in the file). 
         The range represents actual minimum and maximum values seen in the 
         Contagio dataset. 
+        
+        The descriptions are returned as a read-only mapping. 
         '''
-        return copy.copy(_pdfrate_feature_descriptions)
+        return _pdfrate_feature_descriptions_view
 
     @staticmethod
     def get_feature_mask_numpy():
         '''
         Returns a numpy array with 1 for every feature which is modifiable, 
-        otherwise 0. 
+        otherwise 0. The array is shared and read-only, use its copy() 
+        method to obtain a modifiable one. 
         '''
-        return numpy.array([1 if _pdfrate_feature_descriptions[name]['edit'] == 'y' else 0 for name in _pdfrate_feature_names])
+        return _pdfrate_feature_mask
 
 def features_inverse_standardize(feats, standardizer):
     '''
@@ -419,17 +720,25 @@ def features_inverse_standardize(feats, standardizer):
     to standardize it, performs the inverse transformation and makes sure 
     the resulting data types of all features correspond to their descriptions. 
     '''
-    new_feats = list(standardizer.inverse_transform(feats, copy=True))
-    for i in range(0, FeatureDescriptor.get_feature_count()):
-        t = FeatureDescriptor.get_feature_description(i)['type']
-        if t == int:
-            new_feats[i] = int(round(new_feats[i]))
-        elif t == bool:
-            new_feats[i] = False if abs(new_feats[i]) < 0.01 else True
-        elif t == float:
-            new_feats[i] = float(new_feats[i])
-    
-    return new_feats
+    return _typed_feature_values(standardizer.inverse_transform(feats, copy=True))
+
+def _typed_feature_values(feats):
+    '''
+    Converts a numeric feature vector into a list of Python values whose 
+    data types correspond to the feature descriptions. 
+    '''
+    feats = numpy.asarray(feats, dtype=float)
+    # An object array keeps the Python int, bool and float values apart
+    new_feats = numpy.empty(feats.shape, dtype=object)
+    new_feats[_pdfrate_int_mask] = numpy.rint(feats[_pdfrate_int_mask]).astype(int).tolist()
+    new_feats[_pdfrate_float_mask] = feats[_pdfrate_float_mask].tolist()
+    new_feats[_pdfrate_bool_mask] = (numpy.abs(feats[_pdfrate_bool_mask]) >= 0.01).tolist()
+    
+    return new_feats.tolist()
+
+# The range of feature values numpy.fromiter() converts like numpy.array()
+_int64_min = int(numpy.iinfo(numpy.int64).min)
+_int64_max = int(numpy.iinfo(numpy.int64).max)
 
 class FeatureEdit(object):
     '''
@@ -446,24 +755,48 @@ class FeatureEdit(object):
         Constructor. Takes a path to a PDF file as input.
         '''
         self.pdf = pdf
+        # All scans share one read-only memory map of the file
+        with open(pdf, 'rb') as pdf_file:
+            try:
+                self._mm = mmap.mmap(pdf_file.fileno(), 0, access=mmap.ACCESS_READ)
+            except ValueError:
+                # Empty files cannot be mapped
+                self._mm = b''
         self.feature_dict = dict()
         self.insert_offset = self._get_startxref_position()
     
+    def close(self):
+        '''
+        Unmaps the PDF file. Features which were not retrieved before 
+        cannot be read afterwards. 
+        '''
+        if isinstance(self._mm, mmap.mmap):
+            self._mm.close()
+    
     @CachedMethod
     def retrieve_feature_vector(self):
         '''
         Returns a list of feature values, sorted alphabetically by feature 
         name. 
         '''
-        features = sorted(self.retrieve_feature_dictionary().items(), key=operator.itemgetter(0))
-        return [value for (_, value) in features]
+        feature_dict = self.retrieve_feature_dictionary()
+        return [feature_dict[name] for name in _pdfrate_feature_names]
     
     def retrieve_feature_vector_numpy(self):
         '''
         Returns a numpy array of feature values, sorted alphabetically by 
         feature name. 
         '''
-        return numpy.array(self.retrieve_feature_vector()).reshape(1, FeatureDescriptor.get_feature_count())
+        feature_vector = self.retrieve_feature_vector()
+        feature_count = FeatureDescriptor.get_feature_count()
+        # Ints beyond the int64 range may need an object array to stay exact
+        if any(type(v) == int and not _int64_min <= v <= _int64_max for v in feature_vector):
+            return numpy.array(feature_vector).reshape(1, feature_count)
+        try:
+            return numpy.fromiter(feature_vector, dtype=numpy.float64, count=feature_count).reshape(1, feature_count)
+        except TypeError:
+            # Features which could not be extracted hold their exception
+            return numpy.array(feature_vector).reshape(1, feature_count)
     
     @CachedMethod
     def retrieve_feature_dictionary(self):
@@ -475,7 +808,7 @@ class FeatureEdit(object):
         Python bug http://bugs.python.org/issue13817 it no longer is.
         '''
         if len(self.feature_dict) > 0:
-            return copy.deepcopy(self.feature_dict)
+            return dict(self.feature_dict)
 #         queue_in = Queue.Queue()
 #         queue_out = Queue.Queue()
 #         print_lock = threading.Lock()
@@ -544,7 +877,8 @@ class FeatureEdit(object):
                 sys.stderr.write('#'*10)
             feature_dict[method] = r
         self.feature_dict = feature_dict
-        return copy.deepcopy(feature_dict)
+        # Values are scalars or exceptions, a shallow copy is enough
+        return dict(feature_dict)
     
     def retrieve_feature_bounds(self):
         '''
@@ -553,110 +887,160 @@ class FeatureEdit(object):
         bounds are object-dependent. The bounds are returned for all features, 
         including the non-modifiable ones.
         '''
-        def check_current_value(name,value):
-            if value == FileDefined:
-                return getattr(self, 'get_'+name)()
-            else:
-                return value
-        
-        lb = []
-        ub = []
-        fd = FeatureDescriptor.get_feature_descriptions()
-        for key in sorted(fd.keys()):
-            value = fd[key]
-            lb.append(check_current_value(key,value['range'][0]))
-            ub.append(check_current_value(key,value['range'][1]))
-        return (numpy.array(lb),numpy.array(ub))
+        bounds = (_pdfrate_feature_bounds[0].copy(), _pdfrate_feature_bounds[1].copy())
+        for (i, name, b) in _pdfrate_filedefined_bounds:
+            bounds[b][i] = getattr(self, 'get_'+name)()
+        return bounds
     
     @CachedMethod
     def get_size(self):
-        return os.path.getsize(self.pdf)
+        return len(self._mm)
     
     @CachedMethod
     def get_version(self):
-        r = _perl_regex(r'print $1 while /%PDF-1\.(\d)/g', self.pdf)
-        # Orgnal
-        # r = r.split('\n')[0
-        # New
-        r = r.split(b'\n')[0]
-        return int(r) if r else 0
+        # The first header followed by a digit, normally at offset 0
+        i = self._mm.find(b'%PDF-1.')
+        while i >= 0:
+            digit = self._mm[i + 7:i + 8]
+            if digit.isdigit():
+                return int(digit)
+            i = self._mm.find(b'%PDF-1.', i + 1)
+        return 0
+    
+    @CachedMethod
+    def __scan_keywords(self):
+        '''
+        Returns the keyword counts of the single pass over the file and the 
+        offsets of the counted occurrences of the keywords whose positions 
+        are features too.
+        '''
+        counts = dict.fromkeys((feat for (feat, _, _) in _keyword_feats.values()), 0)
+        counts.update(dict.fromkeys(_structure_feats.values(), 0))
+        for (_, plain_feat, obs_feat) in _name_feats.values():
+            counts[plain_feat] = counts[obs_feat] = 0
+        scan_end = dict(counts) # end of the last counted occurrence
+        offsets = {feat : [] for feat in _offset_feats}
+        size = len(self._mm)
+        for match in _regex_keywords.finditer(self._mm):
+            keyword = match.group()
+            (start, end) = match.span()
+            if match.lastgroup is not None:
+                if end >= size or self._mm[end] in _word_bytes:
+                    continue
+                end += 1
+                (_, plain_feat, obs_feat) = _name_feats[match.lastgroup]
+                # Hex-escaped names only count as obfuscated
+                feats = (obs_feat,) if b'#' in keyword else (plain_feat, obs_feat)
+            elif keyword == b'obj':
+                feats = (_structure_feats[keyword],)
+                # Walk back over whitespace, digits, whitespace and a digit
+                i = _run_start(self._mm, start, _whitespace_bytes)
+                j = _run_start(self._mm, i, _digit_bytes) if i < start else i
+                k = _run_start(self._mm, j, _whitespace_bytes) if j < i else j
+                if k == j or k == 0 or self._mm[k - 1] not in _digit_bytes:
+                    continue
+                start = k - 1
+            elif keyword in _structure_feats:
+                feats = (_structure_feats[keyword],)
+                start -= 1
+                if start < 0:
+                    continue
+                if keyword == b'endobj':
+                    if self._mm[start] not in _whitespace_bytes:
+                        continue
+                elif self._mm[start] in _word_bytes:
+                    continue
+                if end >= size or self._mm[end] not in _whitespace_bytes:
+                    continue
+                end = _regex_whitespace.match(self._mm, end).end()
+            else:
+                (feat, leading, trailing) = _keyword_feats[keyword]
+                feats = (feat,)
+                if leading:
+                    start -= 1
+                    if start < 0 or self._mm[start] in _word_bytes:
+                        continue
+                if trailing:
+                    if end >= size or self._mm[end] in _word_bytes:
+                        continue
+                    end += 1
+            for feat in feats:
+                if start >= scan_end[feat]:
+                    counts[feat] += 1
+                    scan_end[feat] = end
+                    if feat in offsets:
+                        offsets[feat].append(match.start())
+        return (counts, offsets)
+    
+    @CachedMethod
+    def __get_keyword_counts(self):
+        return self.__scan_keywords()[0]
+    
+    @CachedMethod
+    def __get_keyword_offsets(self):
+        return self.__scan_keywords()[1]
     
     @CachedMethod
     def get_count_obj(self):
-        r = _perl_regex(r'while (/\d+\s+\d+\s+obj/g) {$c++} print $c', self.pdf)
-        return int(r) if len(r) > 1 else 0
+        return self.__get_keyword_counts()['count_obj']
     
     @CachedMethod
     def get_count_endobj(self):
-        r = _perl_regex(r'while (/\s+endobj\s+/g) {$c++} print $c', self.pdf)
-        return int(r) if len(r) > 1 else 0
+        return self.__get_keyword_counts()['count_endobj']
     
     @CachedMethod
     def get_count_stream(self):
-        r = _perl_regex(r'while (/[^\w]stream\s+/g) {$c++} print $c', self.pdf)
-        return int(r) if len(r) > 1 else 0
+        return self.__get_keyword_counts()['count_stream']
     
     @CachedMethod
     def get_count_endstream(self):
-        r = _perl_regex(r'while (/[^\w]endstream\s+/g) {$c++} print $c', self.pdf)
-        return int(r) if len(r) > 1 else 0
+        return self.__get_keyword_counts()['count_endstream']
     
     @CachedMethod
     def get_count_xref(self):
-        r = _perl_regex(r'while (/[^\w\d]xref[^\w\d]/g) {$c++} print $c', self.pdf)
-        return int(r) if len(r) > 1 else 0
+        return self.__get_keyword_counts()['count_xref']
     
     @CachedMethod
     def get_count_trailer(self):
-        r = _perl_regex(r'while (/[^\w\d]trailer[^\w\d]/g) {$c++} print $c', self.pdf)
-        return int(r) if len(r) > 1 else 0
+        return self.__get_keyword_counts()['count_trailer']
     
     @CachedMethod
     def get_count_startxref(self):
-        r = _perl_regex(r'while (/[^\w\d]startxref[^\w\d]/g) {$c++} print $c', self.pdf)
-        return int(r) if len(r) > 1 else 0
+        return self.__get_keyword_counts()['count_startxref']
     
     @CachedMethod
     def get_count_eof(self):
-        r = _perl_regex(r'while (/%EOF/g) {$c++} print $c', self.pdf)
-        return int(r) if len(r) > 1 else 0
+        return self.__get_keyword_counts()['count_eof']
     
     @CachedMethod
     def get_count_page(self):
-        r = _perl_regex(r'while (/\/Page[^\w\d]/g) {$c++} print $c', self.pdf)
-        return int(r) if len(r) > 1 else 0
+        return self.__get_keyword_counts()['count_page']
     
     @CachedMethod
     def get_count_objstm(self):
-        r = _perl_regex(r'while (/\/ObjStm[^\w\d]/g) {$c++} print $c', self.pdf)
-        return int(r) if len(r) > 1 else 0
+        return self.__get_keyword_counts()['count_objstm']
     
     @CachedMethod
     def get_count_js(self):
         # PDFrate doesn't always find this!
-        r = _perl_regex(r'while (/\/JS[^\w\d]/g) {$c++} print $c', self.pdf)
-        return int(r) if len(r) > 1 else 0
+        return self.__get_keyword_counts()['count_js']
     
     @CachedMethod
     def get_count_javascript(self):
-        r = _perl_regex(r'while (/\/JavaScript[^\w\d]/g) {$c++} print $c', self.pdf)
-        return int(r) if len(r) > 1 else 0
+        return self.__get_keyword_counts()['count_javascript']
     
     @CachedMethod
     def get_count_action(self):
-        r = _perl_regex(r'while (/\/(OpenAction|AA)[^\w\d]/g) {$c++} print $c', self.pdf)
-        return int(r) if len(r) > 1 else 0
+        return self.__get_keyword_counts()['count_action']
     
     @CachedMethod
     def get_count_acroform(self):
         # Not present in the PDFrate output!
-        r = _perl_regex(r'while (/(\/AcroForm)[^\w\d]/g) {$c++} print $c', self.pdf)
-        return int(r) if len(r) > 1 else 0
+        return self.__get_keyword_counts()['count_acroform']
     
     @CachedMethod
     def get_count_font(self):
-        r = _perl_regex(r'while (/(\/Font)[^\w\d]/g) {$c++} print $c', self.pdf)
-        return int(r) if len(r) > 1 else 0
+        return self.__get_keyword_counts()['count_font']
     
     @CachedMethod
     def get_count_stream_diff(self):
@@ -671,35 +1055,27 @@ class FeatureEdit(object):
         # Original
         # return _perl_regex(r'print $1 while /\/ModDate\((.*?)\)/g', self.pdf).splitlines()
         # New
-        return _perl_regex(r'print $1 while /\/ModDate\((.*?)\)/g', self.pdf).splitlines()
+        return _group_lines(_regex_pdf_moddate, self._mm)
 
     @CachedMethod
-    def get_moddate_ts(self):
+    def __get_moddate(self):
+        '''
+        Returns the timestamp and the time zone offset of the last ModDate, 
+        each -1 if it cannot be parsed.
+        '''
         r = self.__get_moddate_raw()
 
-        # Debug
-        # print('moddate raw', r)
-        # print(r[-1])
-
         # Orginal
         # if r: r = r[-1]
         # New
         if r: r = r[-1].decode(errors='replace')
 
         # Date format: D:YYYYMMDDHHmmSSOHH'mm
-        if len(r) < 6 or r[:2] != 'D:': return -1
-        timestamp = 0
-        try:
-            YYYY = int(r[2:6])
-            MM = int(r[6:8]) if len(r) > 6 else 1
-            DD = int(r[8:10]) if len(r) > 8 else 1
-            HH1 = int(r[10:12]) if len(r) > 10 else 0
-            mm1 = int(r[12:14]) if len(r) > 12 else 0
-            SS = int(r[14:16]) if len(r) > 14 else 0
-            O = r[16] if len(r) > 16 else 'Z'
+        if len(r) < 6 or r[:2] != 'D:': # minimum is D:YYYY
+            return (-1, -1)
 
-            # Debug
-            # print('here', YYYY, MM, DD, HH1, mm1, SS, O)
+        try: 
+            O = r[16] if len(r) > 16 else 'Z'
 
             # Original
             HH2 = int(r[17:19]) if len(r) > 17 else 0
@@ -708,83 +1084,50 @@ class FeatureEdit(object):
 
             # r[19] == "'"
             mm2 = int(r[20:22]) if len(r) > 20 else 0
-            tz_sign = '+' if O in ['+', 'Z'] else '-'
-            datetime_str = '{Y:0>4}{m:0>2}{d:0>2}{H:0>2}{M:0>2}{S:0>2}\
-+0000'.format(Y=YYYY, m=MM, d=DD, H=HH1, M=mm1, S=SS, sign=tz_sign, zH=HH2, zM=mm2)
-
-            # Debug
-            # print('datetime string', datetime_str)
+        except Exception:
+            return (-1, -1)
+        tz_sign = '+' if O in ['+', 'Z'] else '-'
+        moddate_tz = HH2 * 3600 + mm2 * 60
+        if tz_sign == '-': moddate_tz = -moddate_tz
 
-            timestamp = dateutil.parser.parse(datetime_str)
-            return int(calendar.timegm(timestamp.utctimetuple()))
+        try:
+            YYYY = int(r[2:6])
+            MM = int(r[6:8]) if len(r) > 6 else 1
+            DD = int(r[8:10]) if len(r) > 8 else 1
+            HH1 = int(r[10:12]) if len(r) > 10 else 0
+            mm1 = int(r[12:14]) if len(r) > 12 else 0
+            SS = int(r[14:16]) if len(r) > 14 else 0
         except:
-            return -1
+            return (-1, moddate_tz)
+        # The time zone offset is ignored, as it always was
+        return (_utc_timestamp(YYYY, MM, DD, HH1, mm1, SS), moddate_tz)
+
+    @CachedMethod
+    def get_moddate_ts(self):
+        return self.__get_moddate()[0]
     
     @CachedMethod
     def get_moddate_tz(self):
-        r = self.__get_moddate_raw()
-
-        # Orginal
-        # if r: r = r[-1]
-        # New
-        if r: r = r[-1].decode(errors='replace')
-
-        # Debug
-        # print('moddate raw', r)
-
-        # Date format: D:YYYYMMDDHHmmSSOHH'mm
-        if len(r) < 6 or r[:2] != 'D:': # minimum is D:YYYY
-            return -1
-
-        moddate_tz = 0
-        try: 
-            O = r[16] if len(r) > 16 else 'Z'
-
-            # Original
-            HH2 = int(r[17:19]) if len(r) > 17 else 0
-            # New
-            # HH2 = int(r[17:18]) if len(r) > 17 else 0
-
-            mm2 = int(r[20:22]) if len(r) > 20 else 0
-            tz_sign = '+' if O in ['+', 'Z'] else '-'
-            moddate_tz = HH2 * 3600 + mm2 * 60
-            if tz_sign == '-': moddate_tz = -moddate_tz
-        except Exception:
-            return -1
-        return moddate_tz
+        return self.__get_moddate()[1]
     
     @CachedMethod
     def __get_createdate_raw(self):
-        return _perl_regex(r'print $1 while /<x[am]p:CreateDate>(.*?)<\/x[am]p:CreateDate>/g', self.pdf).splitlines()
+        return _group_lines(_regex_pdf_createdate, self._mm)
     
     @CachedMethod
-    def get_createdate_ts(self):
+    def __get_createdate(self):
         r = self.__get_createdate_raw()
         if not r: 
-            return -1
-        else: 
-            r = r[-1]
-        try:
-            timestamp = dateutil.parser.parse(r)
-            return int(calendar.timegm(timestamp.utctimetuple()))
-        except:
-            return -1
+            return (-1, -1)
+        return _parse_xmp_date(r[-1])
+    
+    @CachedMethod
+    def get_createdate_ts(self):
+        return self.__get_createdate()[0]
     
     @CachedMethod
     def get_createdate_tz(self):
-        r = self.__get_createdate_raw()
-        if not r: 
-            return -1
-        else: 
-            r = r[-1]
-        try:
-            timezone = dateutil.parser.parse(r).strftime("%z")
-            if not timezone:
-                return -1
-            tz_sec = int(timezone[1:3]) * 3600 + int(timezone[3:5]) * 60
-            return tz_sec if timezone[0] == '+' else -tz_sec
-        except Exception:
-            return -1
+        return self.__get_createdate()[1]
     
     @CachedMethod
     def get_createdate_version_ratio(self):
@@ -817,36 +1160,40 @@ class FeatureEdit(object):
     
     @CachedMethod
     def __get_pdfid0_raw(self):
-        return _perl_regex(r'print $1 while /\/ID\[[^\d|A-F|a-f]*([\d|A-F|a-f]*)/g', self.pdf).splitlines()
+        return _group_lines(_regex_pdf_id0, self._mm)
     
     @CachedMethod
     def __get_pdfid0(self):
-        return self.__get_pdfid0_raw()[-1].decode(errors='replace') if self.__get_pdfid0_raw() else ''
+        return self.__get_pdfid0_raw()[-1] if self.__get_pdfid0_raw() else b''
+    
+    @CachedMethod
+    def __get_pdfid0_classes(self):
+        return _count_char_classes(self.__get_pdfid0())
     
     @CachedMethod
     def get_pdfid0_len(self):
-        return len(self.__get_pdfid0())
+        return self.__get_pdfid0_classes()[4]
     
     @CachedMethod
     def get_pdfid0_lc(self):
         # Orginal
         # return len(filter(str.islower, self.__get_pdfid0()))
         # New
-        return sum(1 for i in filter(str.islower, self.__get_pdfid0()))
+        return self.__get_pdfid0_classes()[0]
 
     @CachedMethod
     def get_pdfid0_uc(self):
         # Orginal
         # return len(filter(str.isupper, self.__get_pdfid0()))
         # New
-        return sum(1 for _ in filter(str.isupper, self.__get_pdfid0()))
+        return self.__get_pdfid0_classes()[1]
     
     @CachedMethod
     def get_pdfid0_num(self):
         # Original
         # return len(filter(str.isdigit, self.__get_pdfid0()))
         # New
-        return sum(1 for _ in filter(str.isdigit, self.__get_pdfid0()))
+        return self.__get_pdfid0_classes()[2]
     
     @CachedMethod
     def get_pdfid0_oth(self):
@@ -861,40 +1208,44 @@ class FeatureEdit(object):
         # Debug
         # print('self.__get_pdfid0()', self.__get_pdfid0())
 
-        return self.__get_pdfid0().count('.')
+        return self.__get_pdfid0_classes()[3]
 
     @CachedMethod
     def __get_pdfid1_raw(self):
-        return _perl_regex(r'print $1 while /\/ID\[[^\d|A-F|a-f]*[\d|A-F|a-f]*[^\d|A-F|a-f]*([\d|A-F|a-f]*)/g', self.pdf).splitlines()
+        return _group_lines(_regex_pdf_id1, self._mm)
     
     @CachedMethod
     def __get_pdfid1(self):
-        return self.__get_pdfid1_raw()[-1].decode(errors='replace') if self.__get_pdfid1_raw() else ''
+        return self.__get_pdfid1_raw()[-1] if self.__get_pdfid1_raw() else b''
+    
+    @CachedMethod
+    def __get_pdfid1_classes(self):
+        return _count_char_classes(self.__get_pdfid1())
     
     @CachedMethod
     def get_pdfid1_len(self):
-        return len(self.__get_pdfid1())
+        return self.__get_pdfid1_classes()[4]
     
     @CachedMethod
     def get_pdfid1_lc(self):
         # Original
         # return len(filter(str.islower, self.__get_pdfid1()))
         # New
-        return sum(1 for _ in filter(str.islower, self.__get_pdfid1()))
+        return self.__get_pdfid1_classes()[0]
     
     @CachedMethod
     def get_pdfid1_uc(self):
         # Original
         # return len(filter(str.isupper, self.__get_pdfid1()))
         # New
-        return sum(1 for _ in filter(str.isupper, self.__get_pdfid1()))
+        return self.__get_pdfid1_classes()[1]
     
     @CachedMethod
     def get_pdfid1_num(self):
         # Original
         # return len(filter(str.isdigit, self.__get_pdfid1()))
         # New
-        return sum(1 for _ in filter(str.isdigit, self.__get_pdfid1()))
+        return self.__get_pdfid1_classes()[2]
     
     @CachedMethod
     def get_pdfid1_oth(self):
@@ -905,7 +1256,7 @@ class FeatureEdit(object):
 
     @CachedMethod
     def get_pdfid1_dot(self):
-        return self.__get_pdfid1().count('.')
+        return self.__get_pdfid1_classes()[3]
 
     @CachedMethod
     def get_pdfid_mismatch(self):
@@ -913,40 +1264,44 @@ class FeatureEdit(object):
     
     @CachedMethod
     def __get_title_raw(self):
-        return _perl_regex(r'print $1 while /\/Title[^\w\d]*\((.*?[^\\]?)\)/g', self.pdf).splitlines()
+        return _group_lines(_regex_pdf_title, self._mm)
 
     @CachedMethod
     def __get_title(self):
-        return _sanitize_PDF_literal_string(self.__get_title_raw()[-1]).decode(errors='replace') if self.__get_title_raw() else ''
+        return _sanitize_PDF_literal_string(self.__get_title_raw()[-1]) if self.__get_title_raw() else b''
+    
+    @CachedMethod
+    def __get_title_classes(self):
+        return _count_char_classes(self.__get_title())
     
     @CachedMethod
     def get_title_len(self):
-        return len(self.__get_title())
+        return self.__get_title_classes()[4]
     
     @CachedMethod
     def get_title_lc(self):
         # Original
         # return len(filter(str.islower, self.__get_title()))
         # New
-        return sum(1 for _ in filter(str.islower, self.__get_title()))
+        return self.__get_title_classes()[0]
 
     @CachedMethod
     def get_title_uc(self):
         # Original
         # return len(filter(str.isupper, self.__get_title()))
         # New
-        return sum(1 for _ in filter(str.isupper, self.__get_title()))
+        return self.__get_title_classes()[1]
 
     @CachedMethod
     def get_title_num(self):
         # Original
         # return len(filter(str.isdigit, self.__get_title()))
         # New
-        return sum(1 for _ in filter(str.isdigit, self.__get_title()))
+        return self.__get_title_classes()[2]
 
     @CachedMethod
     def get_title_dot(self):
-        return self.__get_title().count('.')
+        return self.__get_title_classes()[3]
 
     @CachedMethod
     def get_title_oth(self):
@@ -957,36 +1312,40 @@ class FeatureEdit(object):
 
     @CachedMethod
     def __get_author_raw(self):
-        return _perl_regex(r'print $1 while /\/Author[^\w\d]*\((.*?[^\\]?)\)/g', self.pdf).splitlines()
+        return _group_lines(_regex_pdf_author, self._mm)
     
     @CachedMethod
     def __get_author(self):
-        return _sanitize_PDF_literal_string(self.__get_author_raw()[-1]).decode(errors='replace') if self.__get_author_raw() else ''
+        return _sanitize_PDF_literal_string(self.__get_author_raw()[-1]) if self.__get_author_raw() else b''
 
+    @CachedMethod
+    def __get_author_classes(self):
+        return _count_char_classes(self.__get_author())
+    
     @CachedMethod
     def get_author_len(self):
-        return len(self.__get_author())
+        return self.__get_author_classes()[4]
     
     @CachedMethod
     def get_author_lc(self):
         # Original
         # return len(filter(str.islower, self.__get_author()))
         # New
-        return sum(1 for i in filter(str.islower, self.__get_author()))
+        return self.__get_author_classes()[0]
     
     @CachedMethod
     def get_author_uc(self):
         # Original
         # return len(filter(str.isupper, self.__get_author()))
         # New
-        return sum(1 for _ in filter(str.isupper, self.__get_author()))
+        return self.__get_author_classes()[1]
     
     @CachedMethod
     def get_author_num(self):
         # Original
         # return len(filter(str.isdigit, self.__get_author()))
         # New
-        return sum(1 for _ in filter(str.isdigit, self.__get_author()))
+        return self.__get_author_classes()[2]
     
     @CachedMethod
     def get_author_oth(self):
@@ -1001,42 +1360,44 @@ class FeatureEdit(object):
         # Debug
         # print(self.__get_author().decode(errors='replace'))
 
-        return self.__get_author().count('.')
+        return self.__get_author_classes()[3]
 
     @CachedMethod
     def __get_producer_raw(self):
-        r1 = _perl_regex(r'print $1 while /\/Producer[^\w\d]*\((.*?[^\\]?)\)/g', self.pdf)
-        r2 = _perl_regex(r'print $1 while /Producer>(.*?)<\//g', self.pdf)
-        return (r1 + r2).splitlines()
+        return _group_lines(_regex_pdf_producer, self._mm) + _group_lines(_regex_pdf_producer_xmp, self._mm)
     
     @CachedMethod
     def __get_producer(self):
-        return _sanitize_PDF_literal_string(self.__get_producer_raw()[-1]).decode(errors='replace') if self.__get_producer_raw() else ''
+        return _sanitize_PDF_literal_string(self.__get_producer_raw()[-1]) if self.__get_producer_raw() else b''
+    
+    @CachedMethod
+    def __get_producer_classes(self):
+        return _count_char_classes(self.__get_producer())
     
     @CachedMethod
     def get_producer_len(self):
-        return len(self.__get_producer())
+        return self.__get_producer_classes()[4]
     
     @CachedMethod
     def get_producer_lc(self):
         # Original
         # return len(filter(str.islower, self.__get_producer()))
         # New
-        return sum(1 for _ in filter(str.islower, self.__get_producer()))
+        return self.__get_producer_classes()[0]
     
     @CachedMethod
     def get_producer_uc(self):
         # Original
         # return len(filter(str.isupper, self.__get_producer()))
         # New
-        return sum(1 for _ in filter(str.isupper, self.__get_producer()))
+        return self.__get_producer_classes()[1]
     
     @CachedMethod
     def get_producer_num(self):
         # Original
         # return len(filter(str.isdigit, self.__get_producer()))
         # New
-        return sum(1 for _ in filter(str.isdigit, self.__get_producer()))
+        return self.__get_producer_classes()[2]
     
     @CachedMethod
     def get_producer_oth(self):
@@ -1047,42 +1408,44 @@ class FeatureEdit(object):
 
     @CachedMethod
     def get_producer_dot(self):
-        return self.__get_producer().count('.')
+        return self.__get_producer_classes()[3]
 
     @CachedMethod
     def __get_creator_raw(self):
-        r1 = _perl_regex(r'print $1 while /\/Creator[^\w\d]*\((.*?[^\\]?)\)/g', self.pdf)
-        r2 = _perl_regex(r'print $1 while /CreatorTool>(.*?)<\//g', self.pdf)
-        return (r1 + r2).splitlines()
+        return _group_lines(_regex_pdf_creator, self._mm) + _group_lines(_regex_pdf_creator_tool, self._mm)
     
     @CachedMethod
     def __get_creator(self):
-        return _sanitize_PDF_literal_string(self.__get_creator_raw()[-1]).decode(errors='replace') if self.__get_creator_raw() else ''
+        return _sanitize_PDF_literal_string(self.__get_creator_raw()[-1]) if self.__get_creator_raw() else b''
+    
+    @CachedMethod
+    def __get_creator_classes(self):
+        return _count_char_classes(self.__get_creator())
     
     @CachedMethod
     def get_creator_len(self):
-        return len(self.__get_creator())
+        return self.__get_creator_classes()[4]
     
     @CachedMethod
     def get_creator_lc(self):
         # Original
         # return len(filter(str.islower, self.__get_creator()))
         # New
-        return sum(1 for _ in filter(str.islower, self.__get_creator()))
+        return self.__get_creator_classes()[0]
     
     @CachedMethod
     def get_creator_uc(self):
         # Original
         # return len(filter(str.isupper, self.__get_creator()))
         # New
-        return sum(1 for _ in filter(str.isupper, self.__get_creator()))
+        return self.__get_creator_classes()[1]
     
     @CachedMethod
     def get_creator_num(self):
         # Original
         # return len(filter(str.isdigit, self.__get_creator()))
         # New
-        return sum(1 for _ in filter(str.isdigit, self.__get_creator()))
+        return self.__get_creator_classes()[2]
     
     @CachedMethod
     def get_creator_oth(self):
@@ -1093,43 +1456,47 @@ class FeatureEdit(object):
 
     @CachedMethod
     def get_creator_dot(self):
-        return self.__get_creator().count('.')
+        return self.__get_creator_classes()[3]
 
     @CachedMethod
     def __get_subject_raw(self):
-        return _perl_regex(r'print $1 while /\/Subject[^\w\d]*\((.*?[^\\]?)\)/g', self.pdf).splitlines()
+        return _group_lines(_regex_pdf_subject, self._mm)
     
     @CachedMethod
     def __get_subject(self):
         # Original
         # return _sanitize_PDF_literal_string(self.__get_subject_raw()[-1]) if self.__get_subject_raw() else ''
         # New
-        return _sanitize_PDF_literal_string(self.__get_subject_raw()[-1]).decode(errors='replace') if self.__get_subject_raw() else ''
+        return _sanitize_PDF_literal_string(self.__get_subject_raw()[-1]) if self.__get_subject_raw() else b''
 
+    @CachedMethod
+    def __get_subject_classes(self):
+        return _count_char_classes(self.__get_subject())
+    
     @CachedMethod
     def get_subject_len(self):
-        return len(self.__get_subject())
+        return self.__get_subject_classes()[4]
     
     @CachedMethod
     def get_subject_lc(self):
         # Original
         # return len(filter(str.islower, self.__get_subject()))
         # New
-        return sum(1 for _ in filter(str.islower, self.__get_subject()))
+        return self.__get_subject_classes()[0]
     
     @CachedMethod
     def get_subject_uc(self):
         # Original
         # return len(filter(str.isupper, self.__get_subject()))
         # New
-        return sum(1 for _ in filter(str.isupper, self.__get_subject()))
+        return self.__get_subject_classes()[1]
     
     @CachedMethod
     def get_subject_num(self):
         # Original
         # return len(filter(str.isdigit, self.__get_subject()))
         # New
-        return sum(1 for _ in filter(str.isdigit, self.__get_subject()))
+        return self.__get_subject_classes()[2]
     
     @CachedMethod
     def get_subject_oth(self):
@@ -1140,45 +1507,47 @@ class FeatureEdit(object):
 
     @CachedMethod
     def get_subject_dot(self):
-        return self.__get_subject().count('.')
+        return self.__get_subject_classes()[3]
 
     @CachedMethod
     def __get_keywords_raw(self):
-        r1 = _perl_regex(r'print $1 while /\/Keywords[^\w\d]*\((.*?[^\\]?)\)/g', self.pdf)
-        r2 = _perl_regex(r'print $1 while /\<pdf:Keywords>(.*?)<\/pdf:Keywords>/g', self.pdf)
-        return (r1 + r2).splitlines()
+        return _group_lines(_regex_pdf_keywords, self._mm) + _group_lines(_regex_pdf_keywords_xmp, self._mm)
     
     @CachedMethod
     def __get_keywords(self):
         # Old
         # return _sanitize_PDF_literal_string(self.__get_keywords_raw()[-1]) if self.__get_keywords_raw() else ''
         # New
-        return _sanitize_PDF_literal_string(self.__get_keywords_raw()[-1]).decode(errors='replace') if self.__get_keywords_raw() else ''
+        return _sanitize_PDF_literal_string(self.__get_keywords_raw()[-1]) if self.__get_keywords_raw() else b''
 
+    @CachedMethod
+    def __get_keywords_classes(self):
+        return _count_char_classes(self.__get_keywords())
+    
     @CachedMethod
     def get_keywords_len(self):
-        return len(self.__get_keywords())
+        return self.__get_keywords_classes()[4]
     
     @CachedMethod
     def get_keywords_lc(self):
         # Original
         # return len(filter(str.islower, self.__get_keywords()))
         # New
-        return sum(1 for _ in filter(str.islower, self.__get_keywords()))
+        return self.__get_keywords_classes()[0]
     
     @CachedMethod
     def get_keywords_uc(self):
         # Original
         # return len(filter(str.isupper, self.__get_keywords()))
         # New
-        return sum(1 for _ in filter(str.isupper, self.__get_keywords()))
+        return self.__get_keywords_classes()[1]
     
     @CachedMethod
     def get_keywords_num(self):
         # Original
         # return len(filter(str.isdigit, self.__get_keywords()))
         # New
-        return sum(1 for _ in filter(str.isdigit, self.__get_keywords()))
+        return self.__get_keywords_classes()[2]
     
     @CachedMethod
     def get_keywords_oth(self):
@@ -1189,42 +1558,42 @@ class FeatureEdit(object):
 
     @CachedMethod
     def get_keywords_dot(self):
-        return self.__get_keywords().count('.')
+        return self.__get_keywords_classes()[3]
 
     @CachedMethod
     def get_count_page_obs(self):
-        r = _perl_regex(r'while (/\/(P|#50)(a|#61)(g|#67)(e|#65)[^\w\d]/g) {$c++} print $c', self.pdf)
-        return int(r) - self.get_count_page() if len(r) > 1 else 0
+        r = self.__get_keyword_counts()['count_page_obs']
+        return r - self.get_count_page() if r > 0 else 0
     
     @CachedMethod
     def get_count_objstm_obs(self):
-        r = _perl_regex(r'while (/\/(O|#4[fF])(b|#62)(j|#6[aA])(S|#53)(t|#74)(m|#6[Dd])[^\w\d]/g) {$c++} print $c', self.pdf)
-        return int(r) - self.get_count_objstm() if len(r) > 1 else 0
+        r = self.__get_keyword_counts()['count_objstm_obs']
+        return r - self.get_count_objstm() if r > 0 else 0
     
     @CachedMethod
     def get_count_js_obs(self):
-        r = _perl_regex(r'while (/\/(J|#4[aA])(S|#53)[^\w\d]/g) {$c++} print $c', self.pdf)
-        return int(r) - self.get_count_js() if len(r) > 1 else 0
+        r = self.__get_keyword_counts()['count_js_obs']
+        return r - self.get_count_js() if r > 0 else 0
     
     @CachedMethod
     def get_count_javascript_obs(self):
-        r = _perl_regex(r'while (/\/(J|#4[aA])(a|#61)(v|#76)(a|#61)(S|#53)(c|#63)(r|#72)(i|#69)(p|#70)(t|#74)[^\w\d]/g) {$c++} print $c', self.pdf)
-        return int(r) - self.get_count_javascript() if len(r) > 1 else 0
+        r = self.__get_keyword_counts()['count_javascript_obs']
+        return r - self.get_count_javascript() if r > 0 else 0
     
     @CachedMethod
     def get_count_action_obs(self):
-        r = _perl_regex(r'while (/\/((O|#4F)(p|#70)(e|#65)(n|#6[eE])(A|#41)(c|#63)(t|#74)(i|#69)(o|#6[fF])(n|#6[eE])|(A|#41)(A|#41))[^\w\d]/g) {$c++} print $c', self.pdf)
-        return int(r) - self.get_count_action() if len(r) > 1 else 0
+        r = self.__get_keyword_counts()['count_action_obs']
+        return r - self.get_count_action() if r > 0 else 0
     
     @CachedMethod
     def get_count_acroform_obs(self):
-        r = _perl_regex(r'while (/\/(A|#41)(c|#63)(r|#72)(o|#6[fF])(F|#46)(o|#6[fF])(r|#72)(m|#6[dD])[^\w\d]/g) {$c++} print $c', self.pdf)
-        return int(r) - self.get_count_acroform() if len(r) > 1 else 0
+        r = self.__get_keyword_counts()['count_acroform_obs']
+        return r - self.get_count_acroform() if r > 0 else 0
     
     @CachedMethod
     def get_count_font_obs(self):
-        r = _perl_regex(r'while (/\/(F|#46)(o|#6[fF])(n|#6[eE])(t|#74)[^\w\d]/g) {$c++} print $c', self.pdf)
-        return int(r) - self.get_count_font() if len(r) > 1 else 0
+        r = self.__get_keyword_counts()['count_font_obs']
+        return r - self.get_count_font() if r > 0 else 0
     
     @CachedMethod
     def get_delta_ts(self):
@@ -1268,8 +1637,7 @@ class FeatureEdit(object):
     
     @CachedMethod
     def get_company_mismatch(self):
-        companies = _perl_regex(r'print $1 while /\/Company[^\w\d]*\((.*?[^\\]?)\)/g', self.pdf)
-        return len(set(companies.splitlines()))
+        return len(set(_group_lines(_regex_pdf_company, self._mm)))
     
     @CachedMethod
     def get_subject_mismatch(self):
@@ -1281,109 +1649,67 @@ class FeatureEdit(object):
     
     @CachedMethod
     def __get_boxes_raw(self):
-        r = _perl_regex(r'print sprintf("%d ", ($rr = $1) =~ tr/\r\n/  /), $rr while /\[\s*((([+|-]?(\d+\.?\d*|\d*\.?\d+))\s+){3}([+|-]?(\d+\.?\d*|\d*\.?\d+)))\s*\]/g', self.pdf)
-        boxes = []
-        for box in r.splitlines():
-            # Original
-            # dims, _ = _regex_pdf_box.subn(r'\1 \2 \3 \4', box)
-            # New
-            dims, _ = _regex_pdf_box.subn(r'\1 \2 \3 \4', box.decode(errors='replace'))
-            dims = [float(dim) for dim in dims.split(' ')]
-            boxes.append(dims)
-        return boxes
-    
-    @staticmethod
-    def __is_box_a4(box):
-        return box[0] == 0 and box[1] == 0 and box[2] >= 596 and box[2] <= 599  and box[3] >= 841 and box[3] <= 844
-    
-    @staticmethod
-    def __is_box_letter(box):
-        return box[0] == 0 and box[1] == 0 and box[2] >= 610 and box[2] <= 613  and box[3] >= 790 and box[3] <= 793
-    
-    @staticmethod
-    def __is_box_overlap(box):
-        return box[0] == 0 and box[1] == 0 and box[2] >= 596 and box[2] <= 599  and box[3] >= 790 and box[3] <= 793
-    
-    @staticmethod
-    def __is_box_legal(box):
-        return box[0] == 0 and box[1] == 0 and box[2] >= 610 and box[2] <= 613  and box[3] >= 1006 and box[3] <= 1009
-    
-    @staticmethod
-    def __is_box_other(box):
-        return not (FeatureEdit.__is_box_a4(box) or FeatureEdit.__is_box_letter(box) or FeatureEdit.__is_box_overlap(box) or FeatureEdit.__is_box_legal(box))
+        # One row of four dimensions per box, as floats
+        dims = [float(dim.decode(errors='replace')) for box in _regex_pdf_box.finditer(self._mm) for dim in box.groups()]
+        return numpy.array(dims, dtype=float).reshape(-1, 4)
+    
+    @CachedMethod
+    def __get_box_type_counts(self):
+        boxes = self.__get_boxes_raw()
+        def dims_within(dim, low, high):
+            return (boxes[:, dim] >= low) & (boxes[:, dim] <= high)
+        origin = (boxes[:, 0] == 0) & (boxes[:, 1] == 0)
+        a4 = origin & dims_within(2, 596, 599) & dims_within(3, 841, 844)
+        letter = origin & dims_within(2, 610, 613) & dims_within(3, 790, 793)
+        overlap = origin & dims_within(2, 596, 599) & dims_within(3, 790, 793)
+        legal = origin & dims_within(2, 610, 613) & dims_within(3, 1006, 1009)
+        nonother = int(numpy.count_nonzero(a4 | letter | overlap | legal))
+        return {'a4' : int(numpy.count_nonzero(a4)), 
+                'letter' : int(numpy.count_nonzero(letter)), 
+                'overlap' : int(numpy.count_nonzero(overlap)), 
+                'legal' : int(numpy.count_nonzero(legal)), 
+                'other' : len(boxes) - nonother, 
+                'nonother' : nonother}
     
     @CachedMethod
     def get_count_box_a4(self):
-        count = 0
-        for box in self.__get_boxes_raw():
-            if self.__is_box_a4(box):
-                count += 1
-        return count
+        return self.__get_box_type_counts()['a4']
     
     @CachedMethod
     def get_count_box_letter(self):
-        count = 0
-        for box in self.__get_boxes_raw():
-            if self.__is_box_letter(box):
-                count += 1
-        return count
+        return self.__get_box_type_counts()['letter']
     
     @CachedMethod
     def get_count_box_overlap(self):
-        count = 0
-        for box in self.__get_boxes_raw():
-            if self.__is_box_overlap(box):
-                count += 1
-        return count
+        return self.__get_box_type_counts()['overlap']
     
     @CachedMethod
     def get_count_box_legal(self):
-        count = 0
-        for box in self.__get_boxes_raw():
-            if self.__is_box_legal(box):
-                count += 1
-        return count
+        return self.__get_box_type_counts()['legal']
     
     @CachedMethod
     def get_count_box_other(self):
-        count = 0
-        for box in self.__get_boxes_raw():
-            if self.__is_box_other(box):
-                count += 1
-        return count
+        return self.__get_box_type_counts()['other']
     
     @CachedMethod
     def get_box_other_only(self):
-        for box in self.__get_boxes_raw():
-            if not self.__is_box_other(box):
-                return False
-        return True
+        return self.__get_box_type_counts()['nonother'] == 0
     
     @CachedMethod
     def get_box_nonother_types(self):
-        count = 0
-        for box in self.__get_boxes_raw():
-            if not self.__is_box_other(box):
-                count += 1
-        return count
+        return self.__get_box_type_counts()['nonother']
     
     @CachedMethod
     def __get_images_raw(self):
-        r = _perl_regex(r'print sprintf("%d ", ($rr = $1) =~ tr/\r\n/  /), $rr while /(<<[^<]*?\/Height\s+\d+.*?>>)/g', self.pdf)
         image_sizes = []
-
-        # New
-        r = r.decode(errors='replace')
-
-        for line in r.split('\n'):
-            if not line:
-                continue
-            height, _ = _regex_pdf_image_height.subn(r'\1', line)
-            width, nsubs = _regex_pdf_image_width.subn(r'\1', line)
-            if nsubs != 1:
+        for match in _regex_pdf_image.finditer(self._mm):
+            image = match.group().decode(errors='replace')
+            height = _regex_pdf_image_height.match(image)
+            width = _regex_pdf_image_width.match(image)
+            if width is None:
                 # Not an image
                 continue
-            image_sizes.append(int(height) * int(width))
+            image_sizes.append(int(height.group(1)) * int(width.group(1)))
         return image_sizes
     
     @CachedMethod
@@ -1394,25 +1720,32 @@ class FeatureEdit(object):
     def get_count_image_total(self):
         return len(self.__get_images_raw())
     
+    @CachedMethod
+    def __get_image_size_counts(self):
+        # Images per size bucket, from xsmall to xlarge. Sizes beyond int64 
+        # make an object array, which searchsorted still compares exactly.
+        buckets = numpy.searchsorted(_image_size_thresholds, numpy.array(self.__get_images_raw()))
+        return numpy.bincount(buckets, minlength=len(_image_size_thresholds) + 1).tolist()
+    
     @CachedMethod
     def get_count_image_xsmall(self):
-        return len([1 for image_size in self.__get_images_raw() if image_size <= 4096])
+        return self.__get_image_size_counts()[0]
     
     @CachedMethod
     def get_count_image_small(self):
-        return len([1 for image_size in self.__get_images_raw() if image_size > 4096 and image_size <= 64000])
+        return self.__get_image_size_counts()[1]
     
     @CachedMethod
     def get_count_image_med(self):
-        return len([1 for image_size in self.__get_images_raw() if image_size > 64000 and image_size <= 786432])
+        return self.__get_image_size_counts()[2]
     
     @CachedMethod
     def get_count_image_large(self):
-        return len([1 for image_size in self.__get_images_raw() if image_size > 786432 and image_size <= 12582912])
+        return self.__get_image_size_counts()[3]
     
     @CachedMethod
     def get_count_image_xlarge(self):
-        return len([1 for image_size in self.__get_images_raw() if image_size > 12582912])
+        return self.__get_image_size_counts()[4]
     
     @CachedMethod
     def get_image_mismatch(self):
@@ -1436,21 +1769,13 @@ class FeatureEdit(object):
     
     @CachedMethod
     def __get_obj_sizes_raw(self):
-        r1 = _perl_regex(r'print sprintf("%d", @-[1]) while /\d+\s+\d+\s+(obj)/g', self.pdf)
-        r2 = _perl_regex(r'print sprintf("%d", @-[1]) while /(endobj)/g', self.pdf)
-        if r1:
-            # Original
-            # r1 = [int(r) for r in r1.split('\n') if r]
-            # New
-            r1 = [int(r) for r in r1.split(b'\n') if r]
-        else:
+        # Offsets of the 'obj' keywords and of the 'endobj' keywords, paired 
+        # up in order
+        r1 = self.__get_keyword_offsets()['count_obj']
+        if not r1:
             return [0]
-        if r2:
-            # Original
-            # r2 = [int(r) for r in r2.split('\n') if r]
-            # New
-            r2 = [int(r) for r in r2.split(b'\n') if r]
-        else:
+        r2 = list(_find_all(self._mm, b'endobj'))
+        if not r2:
             return [0]
         return [b - a for a, b in zip(r1, r2) if (b - a) > 0]
 #         r = re.compile(r'\d+\s+\d+\s+(obj)')
@@ -1481,12 +1806,8 @@ class FeatureEdit(object):
     
     @CachedMethod
     def __get_stream_sizes_raw(self):
-        r = _perl_regex(r'print sprintf("%d", @-[2]-@-[1]) while /[^\w](s)tream\s.*?[^\w](e)ndstream\s/sg', self.pdf)
-        if not r: return [0]
-        # Original
-        # return [int(line) for line in r.split('\n') if line]
-        # New
-        return [int(line) for line in r.split(b'\n') if line]
+        r = list(_stream_distances(self._mm))
+        return r if r else [0]
     
     @CachedMethod
     def get_len_stream_min(self):
@@ -1503,12 +1824,9 @@ class FeatureEdit(object):
     
     @CachedMethod
     def __get_eof_positions_raw(self):
-        r = _perl_regex(r'print sprintf("%d", @-[1]) while /%(E)OF/g', self.pdf)
-        if not r: return [0]
-        # Original
-        # return [int(line) for line in r.split('\n') if line]
-        # New
-        return [int(line) for line in r.split(b'\n') if line]
+        # Offsets of the 'E' in '%EOF'
+        r = [i + 1 for i in _find_all(self._mm, b'%EOF')]
+        return r if r else [0]
     
     @CachedMethod
     def get_pos_eof_min(self):
@@ -1525,11 +1843,8 @@ class FeatureEdit(object):
     
     @CachedMethod
     def __get_page_positions_raw(self):
-        r = _perl_regex(r'print sprintf("%d", @-[1]) while /\/(P)age[^\w\d]/g', self.pdf)
-        # Original
-        # return [int(line) for line in r.split('\n') if line]
-        # New
-        return [int(line) for line in r.split(b'\n') if line]
+        # Offsets of the 'P' in '/Page'
+        return [i + 1 for i in self.__get_keyword_offsets()['count_page']]
     
     @CachedMethod
     def get_pos_page_min(self):
@@ -1548,11 +1863,7 @@ class FeatureEdit(object):
     
     @CachedMethod
     def __get_acroform_positions_raw(self):
-        r = _perl_regex(r'print sprintf("%d", @-[1]) while /(\/AcroForm)[^\w\d]/g', self.pdf)
-        # Original
-        # return [int(line) for line in r.split('\n') if line]
-        # New
-        return [int(line) for line in r.split(b'\n') if line]
+        return self.__get_keyword_offsets()['count_acroform']
     
     @CachedMethod
     def get_pos_acroform_min(self):
@@ -1571,11 +1882,7 @@ class FeatureEdit(object):
     
     @CachedMethod
     def __get_box_positions_raw(self):
-        r = _perl_regex(r'print sprintf("%d", @-[1]) while /\[\s*((([+|-]?(\d+\.?\d*|\d*\.?\d+))\s+){3}([+|-]?(\d+\.?\d*|\d*\.?\d+)))\s*\]/g', self.pdf)
-        # Original
-        # return [int(line) for line in r.split('\n') if line]
-        # New
-        return [int(line) for line in r.split(b'\n') if line]
+        return [box.start(1) for box in _regex_pdf_box.finditer(self._mm)]
     
     @CachedMethod
     def get_pos_box_min(self):
@@ -1594,11 +1901,7 @@ class FeatureEdit(object):
     
     @CachedMethod
     def __get_image_positions_raw(self):
-        r = _perl_regex(r'print sprintf("%d", @-[1]) while /(<<(?=.*\/Height\s+\d+)(?=.*\/Width\s+\d+)(?:.*?<<.*>>)*.*?>>)/g', self.pdf)
-        # Original
-        # return [int(line) for line in r.split('\n') if line]
-        # New
-        return [int(line) for line in r.split(b'\n') if line]
+        return [match.start(1) for match in _regex_pdf_image_position.finditer(self._mm)]
     
     @CachedMethod
     def get_pos_image_min(self):
@@ -1617,42 +1920,52 @@ class FeatureEdit(object):
     
     @CachedMethod
     def _get_startxref_position(self):
-        r = _perl_regex(r'print sprintf("%d", @-[1]) while /[^\w\d](startxref)[^\w\d]/g', self.pdf)
-        # Original
-        # r = r.split('\n')
-        # New
-        r = r.split(b'\n')
-        return int(r[-2]) if len(r) > 1 else self.get_size()
+        # The last match of /[^\w\d](startxref)[^\w\d]/g, searched from the end
+        def delimited(i):
+            return (i > 0 and self._mm[i - 1] not in _word_bytes and 
+                    i + 9 < len(self._mm) and self._mm[i + 9] not in _word_bytes)
+        
+        i = self._mm.rfind(b'startxref')
+        while i >= 0 and not delimited(i):
+            i = self._mm.rfind(b'startxref', 0, i)
+        if i < 0:
+            return self.get_size()
+        # Occurrences sharing a single delimiter byte are matched alternately
+        j = i
+        while j >= 10 and self._mm[j - 10:j - 1] == b'startxref' and delimited(j - 10):
+            j -= 10
+        return i if (i - j) % 20 == 0 else i - 10
     
     def check_feature_change_valid(self, feat, feat_val):
-        feat_name = FeatureDescriptor.get_feature_name(feat) if type(feat) == int else feat
-        feat_desc = FeatureDescriptor.get_feature_descriptions()[feat_name]
+        feat_name = _pdfrate_feature_names[feat] if type(feat) == int else feat
+        feat_desc = _pdfrate_feature_descriptions[feat_name]
         if feat_desc['type'] != type(feat_val):
             return TypeError("Got {got}, expected {expected}.".format(got=type(feat_val), expected=feat_desc['type']))
         if feat_desc['edit'] != 'y':
             return ReadOnlyFeatureError("Feature '{}' cannot be modified.".format(feat_name))
         if type(feat_val) == bool:
             return True # No need to check value range
-        current_value = getattr(self, 'get_{}'.format(feat_name))()
+        current_value = getattr(self, 'get_' + feat_name)()
+        (lower, upper) = feat_desc['range'][:2]
         
         # Debug
         # print(current_value)
         # print(feat_desc)
         
-        if feat_desc['range'][0] == FileDefined:
+        if lower == FileDefined:
             if current_value > feat_val:
                 return MinimumExceededError("Feature '{feat}' value minimum is {min}, got {got}.".format(feat=feat_name, min=current_value, got=feat_val))
-        elif feat_desc['range'][0] > feat_val:
-            return MinimumExceededError("Feature '{feat}' value minimum is {min}, got {got}.".format(feat=feat_name, min=feat_desc['range'][0], got=feat_val))
+        elif lower > feat_val:
+            return MinimumExceededError("Feature '{feat}' value minimum is {min}, got {got}.".format(feat=feat_name, min=lower, got=feat_val))
         
-        if feat_desc['range'][1] == FileDefined:
+        if upper == FileDefined:
             if current_value < feat_val:
                 return MaximumExceededError("Feature '{feat}' value maximum is {max}, got {got}.".format(feat=feat_name, max=current_value, got=feat_val))
-        elif feat_desc['range'][1] < feat_val:
-            return MaximumExceededError("Feature '{feat}' value maximum is {max}, got {got}.".format(feat=feat_name, max=feat_desc['range'][1], got=feat_val))
+        elif upper < feat_val:
+            return MaximumExceededError("Feature '{feat}' value maximum is {max}, got {got}.".format(feat=feat_name, max=upper, got=feat_val))
         return True
     
-    def modify_file(self, features, dir='/tmp', verbose=False):
+    def modify_file(self, features, dir='/tmp', verbose=False, extract_feats=True):
         '''
         Makes a new PDF file with the specified features modified, if 
         possible. 
@@ -1660,6 +1973,8 @@ class FeatureEdit(object):
             features: a vector of desired features or a dictionary with feature 
                       names mapped to desired values. 
             verbose: prints a lot if True
+            extract_feats: if False, the features of the newly-created PDF 
+                           file are not extracted and 'feats' is None
         
         Currently, these 68 features are modifiable: 
         
@@ -1684,22 +1999,22 @@ class FeatureEdit(object):
                            'succes' : boolean, indicating modification success
                            'val' : the value which ended up in the file 
                         }
-            'feats' : A numpy feature vector of the newly-created PDF file. 
+            'feats' : A numpy feature vector of the newly-created PDF file 
+                      or None if extract_feats is False. 
         }
         '''
+        import secrets
+        import tempfile
+        
         if type(features) == numpy.ndarray:                                         # This section creates a
-            new_feats = []                                                          # new feature dictionary
-            for i in range(0, FeatureDescriptor.get_feature_count()):               # starting from a numpy
-                t = FeatureDescriptor.get_feature_description(i)['type']            # array (assumes ordered)
-                if t == int:
-                    new_feats.append(int(round(features[i])))
-                elif t == bool:
-                    new_feats.append(False if abs(features[i]) < 0.01 else True)
-                elif t == float:
-                    new_feats.append(float(features[i]))
-            features = new_feats
+            features = _typed_feature_values(features)                              # new feature dictionary from
+                                                                                    # a numpy array (assumes ordered)
         if type(features) == list:
             features = dict(zip(FeatureDescriptor.get_feature_names(), features))
+            # Built in the (sorted) feature order
+            feature_items = features.items()
+        else:
+            feature_items = None
         assert type(features) == dict                                               # Up to here
         # Generate a new PDF file
         newpdf = tempfile.NamedTemporaryFile(
@@ -1707,33 +2022,32 @@ class FeatureEdit(object):
             mode='w+b',     # New
             # bufsize=10*1024*1024,  # Original
             # suffix='.pdf',  # Original
-            suffix=hashlib.md5(str(time.time()).encode('utf-8')).hexdigest() + '.pdf',
+            suffix=secrets.token_hex(8) + '.pdf',
             delete=False,
             dir=dir,
         )
         
-        # Copy the old one into the new one
-        with open(self.pdf, 'rb') as oldpdf:
-            oldbytes = oldpdf.read(1024)
-            while oldbytes:
-                newpdf.write(oldbytes)
-                oldbytes = oldpdf.read(1024)
+        # Copy the old one into the new one, straight from its mapping
+        newpdf.write(self._mm)
         
         # Flush the file, so that the changes are visible when we mmap() it
         newpdf.flush()
         
         # Map the file into memory for regular expression support
-        ORIGINAL_SIZE = os.path.getsize(newpdf.name)
+        ORIGINAL_SIZE = self.get_size()  # the copy is as long as the mapped original
         mm = mmap.mmap(newpdf.fileno(), ORIGINAL_SIZE, access=mmap.ACCESS_WRITE)
         
         # Reset insert offset
         self.insert_offset = self._get_startxref_position()
         report = {}
         to_change = {} # features with required new values
+        inserts = [] # strings to insert at the insert offset, in order
         features_current = self.retrieve_feature_dictionary()
         
         # Check which of the requested features we can modify
-        for (feat, feat_val) in iter(sorted(features.items())):
+        if feature_items is None:
+            feature_items = sorted(features.items())
+        for (feat, feat_val) in feature_items:
             if features_current[feat] != feat_val and not isinstance(feat_val, Exception):
                 if type(feat_val) == float and abs(features_current[feat] - feat_val) < 1e-6:
                     pass
@@ -1787,7 +2101,7 @@ class FeatureEdit(object):
                 # if verbose: print "Inserting '%s'*%d" % (_incrementable_feats[feat], increase)
                 # New
                 if verbose: print("Inserting '%s'*%d" % (_incrementable_feats[feat], increase))
-                self._insert_into_mmap(mm, ' {}\n'.format(_incrementable_feats[feat]) * increase)
+                inserts.append(' {}\n'.format(_incrementable_feats[feat]) * increase)
                 report[feat] = to_change[feat]
                 del to_change[feat]
         # These changes are not in place. They will add bytes to the file.
@@ -1800,29 +2114,21 @@ class FeatureEdit(object):
             # Gather all incrementable metadata features with the given prefix
             metadata_feats = [f[len(feat_prefix) + 1:] for f in to_change if f.startswith(feat_prefix) and not f.endswith(('mismatch', 'len'))]
             # metadata_feats now contains the list of suffixes of the features to modify
-            addendum = ''
+            addenda = []
             # Insert the required characters
             for feat_suffix in metadata_feats:  # This loop creates a
                 feat = '{pre}_{suf}'.format(pre=feat_prefix, suf=feat_suffix)
-                if feat_suffix == 'lc':
-                    addendum += 'a' * (to_change[feat])
-                elif feat_suffix == 'uc':
-                    addendum += 'Z' * (to_change[feat])
-                elif feat_suffix == 'num':
-                    addendum += '3' * (to_change[feat])
-                elif feat_suffix == 'oth':
-                    addendum += '-' * (to_change[feat])
-                elif feat_suffix == 'dot':
-                    addendum += '.' * (to_change[feat])
+                addenda.append(_metadata_suffix_chars.get(feat_suffix, '') * to_change[feat])
                 report[feat] = to_change[feat]
                 del to_change[feat]
+            addendum = ''.join(addenda)
             # Write the formatted feature into the PDF file
             if addendum:
                 # Original
                 # if verbose: print "Inserting '%s'" % feat_str.format(addendum)
                 # New
                 if verbose: print("Inserting '%s'" % feat_str.format(addendum))
-                self._insert_into_mmap(mm, feat_str.format(addendum))
+                inserts.append(feat_str.format(addendum))
         # These modifications are not in place. They will add bytes to the file.
         
         # Modify modification timestamp and/or timezone
@@ -1840,30 +2146,17 @@ class FeatureEdit(object):
                 del to_change['moddate_ts']
             else:
                 ts_str = ts_str.format(a=time.gmtime(self.get_moddate_ts()))
-            tz_str = "{sign}{h:0>2}'{m:0>2}"
             if 'moddate_tz' in to_change:
-                new_tz = to_change['moddate_tz']
-                if new_tz == 0:
-                    tz_str = 'Z'
-                else:
-                    tz_str = tz_str.format(sign = '+' if new_tz > 0 else '-', h = abs(new_tz) / 3600, m = (abs(new_tz) % 3600) / 60)
+                tz_str = _tz_offset_string(to_change['moddate_tz'], "'")
                 report['moddate_tz'] = to_change['moddate_tz']
                 del to_change['moddate_tz']
             else:
-                tz_str = 'Z'
-                old_tz = self.get_moddate_tz()
-                if old_tz != 0:
-                    tz_str = "{sign}{h:0>2}'{m:0>2}".format(sign = '+' if old_tz > 0 else '-', h = abs(old_tz) / 3600, m = (abs(old_tz) % 3600) / 60)
+                tz_str = _tz_offset_string(self.get_moddate_tz(), "'")
             # Check if there already exists a moddate which can be modified in-place
-            datelines = _perl_regex(r'print @-[1], " ", $1 while /\/ModDate\((.*?)\)/g', self.pdf).splitlines()
+            last_date = _last_start_group(_regex_pdf_moddate, self._mm)
             modified = False
-            if datelines:
-                # Original
-                # datelines = datelines[-1].split(' ')
-                # New
-                datelines = datelines[-1].split(b' ')
-                mod_location = int(datelines[0])
-                old_moddate = datelines[1]
+            if last_date is not None:
+                (mod_location, old_moddate) = last_date
                 new_moddate = 'D:{ts}{tz}'.format(ts = ts_str, tz=tz_str)
                 if len(new_moddate) == len(old_moddate):
                     # Original
@@ -1879,7 +2172,7 @@ class FeatureEdit(object):
                 # if verbose: print 'Inserting "%s"' % moddate.format(ts = ts_str, tz=tz_str)
                 # New
                 if verbose: print('Inserting "%s"' % moddate.format(ts = ts_str, tz=tz_str))
-                self._insert_into_mmap(mm, moddate.format(ts = ts_str, tz=tz_str))
+                inserts.append(moddate.format(ts = ts_str, tz=tz_str))
             
         
         # Modify creation timestamp and/or timezone
@@ -1892,30 +2185,17 @@ class FeatureEdit(object):
                 del to_change['createdate_ts']
             else:
                 ts_str = ts_str.format(a=time.gmtime(self.get_moddate_ts()))
-            tz_str = "{sign}{h:0>2}:{m:0>2}"
             if 'createdate_tz' in to_change:
-                new_tz = to_change['createdate_tz']
-                if new_tz == 0:
-                    tz_str = 'Z'
-                else:
-                    tz_str = tz_str.format(sign = '+' if new_tz > 0 else '-', h = abs(new_tz) / 3600, m = (abs(new_tz) % 3600) / 60)
+                tz_str = _tz_offset_string(to_change['createdate_tz'], ":")
                 report['createdate_tz'] = to_change['createdate_tz']
                 del to_change['createdate_tz']
             else:
-                tz_str = 'Z'
-                old_tz = self.get_createdate_tz()
-                if old_tz != 0:
-                    tz_str = "{sign}{h:0>2}'{m:0>2}".format(sign = '+' if old_tz > 0 else '-', h = abs(old_tz) / 3600, m = (abs(old_tz) % 3600) / 60)
+                tz_str = _tz_offset_string(self.get_createdate_tz(), "'")
             # Check if there already exists a moddate which can be modified in-place
-            datelines = _perl_regex(r'print @-[1], " ", $1 while /<x[am]p:CreateDate>(.*?)<\/x[am]p:CreateDate>/g', self.pdf).splitlines()
+            last_date = _last_start_group(_regex_pdf_createdate, self._mm)
             modified = False
-            if datelines:
-                # Original
-                # datelines = datelines[-1].split(' ')
-                # New
-                datelines = datelines[-1].split(b' ')
-                mod_location = int(datelines[0])
-                old_createdate = datelines[1]
+            if last_date is not None:
+                (mod_location, old_createdate) = last_date
                 new_createdate = '{ts}{tz}'.format(ts = ts_str, tz=tz_str)
                 if len(new_createdate) == len(old_createdate):
                     # Original
@@ -1930,17 +2210,17 @@ class FeatureEdit(object):
                 # if verbose: print 'Inserting "%s"' % createdate.format(ts = ts_str, tz=tz_str)
                 # New
                 if verbose: print('Inserting "%s"' % createdate.format(ts = ts_str, tz=tz_str))
-                self._insert_into_mmap(mm, createdate.format(ts = ts_str, tz=tz_str))
+                inserts.append(createdate.format(ts = ts_str, tz=tz_str))
         
         # Modify size by inserting spaces. Make sure this one comes last
         if 'size' in to_change:
-            insert_count = to_change['size'] - mm.size()
+            insert_count = to_change['size'] - mm.size() - sum(len(data.encode()) for data in inserts)
             if insert_count > 0:
                 # Original
                 # if verbose: print 'Modifying size by inserting {} bytes'.format(insert_count)
                 # New
                 if verbose: print('Modifying size by inserting {} bytes'.format(insert_count))
-                self._insert_into_mmap(mm, ' ' * insert_count)
+                inserts.append(' ' * insert_count)
                 report['size'] = to_change['size']
                 del to_change['size']
             else:
@@ -1949,6 +2229,11 @@ class FeatureEdit(object):
                 # New
                 if verbose: print('Not modifying size [{} extra bytes already]'.format(-insert_count))
         
+        # Insert all the new content at once, moving the rest of the file 
+        # only a single time
+        if inserts:
+            self._insert_into_mmap(mm, ''.join(inserts))
+        
         # Flush the memory-mapped file to save changes and close it
         mm.flush()
         mm.close()
@@ -1973,7 +2258,8 @@ class FeatureEdit(object):
                 report[k] = {'success':True, 'val':report[k]}
         for k in to_change.keys():
             report[k] = {'success':False, 'val':to_change[k]}
-        return {'path' : newpdf.name, 'report' : report, 'feats' : FeatureEdit(newpdf.name).retrieve_feature_vector_numpy()}
+        feats = FeatureEdit(newpdf.name).retrieve_feature_vector_numpy() if extract_feats else None
+        return {'path' : newpdf.name, 'report' : report, 'feats' : feats}
 
     # This function insert the actual bytes inside the PDF file.
     # First it finds the position of the unused space at the end of the file,